@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Literal, NamedTuple, Optional, Tuple, Union
 
 import bcrypt
 from uuid import uuid4
@@ -10,8 +11,7 @@ from domain.models import Account, User
 from domain.repositories import AccountRepository, IdentityRepository, UserRepository
 
 
-@dataclass
-class ExternalContext:
+class ExternalContext(NamedTuple):
     """
     Information about the caller from a particular channel (Telegram, Discord, web).
 
@@ -25,24 +25,58 @@ class ExternalContext:
     last_name: str
 
 
-@dataclass
-class BroadcastMessage:
-    """A message that should be delivered to a particular user."""
+@lru_cache(maxsize=4096)
+def external_context(
+    provider: str,
+    provider_user_id: str,
+    first_name: str,
+    last_name: str,
+) -> ExternalContext:
+    """
+    Return the `ExternalContext` for the given caller.
+
+    Contexts are immutable, so interfaces share one instance per distinct
+    identity and name across messages; a name change is simply a new key.
+    """
+
+    return ExternalContext(provider, provider_user_id, first_name, last_name)
+
 
-    user_id: str
+class BroadcastMessage(NamedTuple):
+    """
+    A message that should be delivered to a particular user, or to every
+    user when `audience` is "all" (in which case `user_id` is None and the
+    interface layer resolves recipients itself).
+
+    `priority` messages (e.g. a player's own balance change) should be
+    delivered immediately rather than batched with other notifications.
+    """
+
+    user_id: Optional[str]
     text: str
+    audience: Literal["user", "all"] = "user"
+    priority: bool = False
+
 
+@dataclass(slots=True, frozen=True)
+class BulkBroadcast:
+    """The same message delivered to each of several users."""
 
-@dataclass
+    text: str
+    user_ids: Tuple[str, ...]
+    priority: bool = False
+
+
+@dataclass(slots=True, frozen=True)
 class OperationResult:
     """Generic result type for simple operations."""
 
     success: bool
     error_message: Optional[str] = None
-    broadcasts: List[BroadcastMessage] = field(default_factory=list)
+    broadcasts: List[Union[BroadcastMessage, BulkBroadcast]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InitiateBuyFromResult:
     """Result of initiating a player-to-player buy request."""
 
@@ -166,7 +200,7 @@ def buy_chips_from_bank(
 
     # Message uses the platform username (stored in `first_name`).
     text = f"{user.first_name} buys {amount}"
-    broadcasts = [BroadcastMessage(user_id=user.id, text=text)]
+    broadcasts = [BroadcastMessage(user_id=user.id, text=text, priority=True)]
 
     return OperationResult(success=True, broadcasts=broadcasts)
 
@@ -198,7 +232,7 @@ def sell_chips_to_bank(
     user_repo.update_balance(user.id, amount)
 
     text = f"{user.first_name} sells {amount}"
-    broadcasts = [BroadcastMessage(user_id=user.id, text=text)]
+    broadcasts = [BroadcastMessage(user_id=user.id, text=text, priority=True)]
 
     return OperationResult(success=True, broadcasts=broadcasts)
 
@@ -245,15 +279,12 @@ def buy_chips_from_user(
             error_message="You cannot buy chips from yourself.",
         )
 
-    user_repo.update_balance(buyer.id, -amount)
-    user_repo.update_balance(seller.id, amount)
+    if not user_repo.transfer_balance(buyer.id, seller.id, amount):
+        return OperationResult(success=False, error_message="Buyer or seller not found.")
 
     # Single, neutral message: buyer does something to seller.
     text = f"{buyer.first_name} buys {amount} from {seller.first_name}"
-    broadcasts = [
-        BroadcastMessage(user_id=buyer.id, text=text),
-        BroadcastMessage(user_id=seller.id, text=text),
-    ]
+    broadcasts = [BulkBroadcast(text=text, user_ids=(buyer.id, seller.id))]
 
     return OperationResult(success=True, broadcasts=broadcasts)
 
@@ -300,14 +331,11 @@ def sell_chips_to_user(
             error_message="You cannot sell chips to yourself.",
         )
 
-    user_repo.update_balance(buyer.id, -amount)
-    user_repo.update_balance(seller.id, amount)
+    if not user_repo.transfer_balance(buyer.id, seller.id, amount):
+        return OperationResult(success=False, error_message="Buyer or seller not found.")
 
     text = f"{seller.first_name} sells {amount} to {buyer.first_name}"
-    broadcasts = [
-        BroadcastMessage(user_id=seller.id, text=text),
-        BroadcastMessage(user_id=buyer.id, text=text),
-    ]
+    broadcasts = [BulkBroadcast(text=text, user_ids=(seller.id, buyer.id))]
 
     return OperationResult(success=True, broadcasts=broadcasts)
 
@@ -335,8 +363,7 @@ def initiate_buy_from_player(
             error_message="You must /join <table> <username> before buying from another player.",
         )
 
-    all_users = user_repo.get_all_users()
-    candidates = [u for u in all_users if u.id != source_user.id]
+    candidates = user_repo.list_other_users(source_user.id)
 
     if not candidates:
         return InitiateBuyFromResult(
@@ -376,15 +403,20 @@ def confirm_buy_from_player(
     if source is None or target is None:
         return OperationResult(success=False, error_message=" Buyer or seller not found.")
 
-    user_repo.update_balance(source.id, -amount)
-    user_repo.update_balance(target.id, amount)
+    if source.id == target.id:
+        return OperationResult(
+            success=False,
+            error_message="You cannot buy chips from yourself.",
+        )
+
+    if not user_repo.transfer_balance(source.id, target.id, amount):
+        return OperationResult(success=False, error_message=" Buyer or seller not found.")
 
-    users = user_repo.get_all_users()
     text = (
         f"{source.first_name} buys {amount} "
         f"from {target.first_name}"
     )
-    broadcasts = [BroadcastMessage(user_id=u.id, text=text) for u in users]
+    broadcasts = [BroadcastMessage(user_id=None, text=text, audience="all")]
 
     return OperationResult(success=True, broadcasts=broadcasts)
 
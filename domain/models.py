@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class User:
     """
     Domain representation of a poker user/player.
@@ -16,7 +16,7 @@ class User:
     balance: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Account:
     """
     Authentication identity for a player on the poker platform.
@@ -19,21 +19,53 @@ class UserRepository(Protocol):
 
         ...
 
+    def get_users(self, user_ids: List[str]) -> List[User]:
+        """
+        Return the users with the given internal IDs, in the order given.
+        IDs with no matching user are skipped.
+        """
+
+        ...
+
     def get_all_users(self) -> List[User]:
         """Return all users currently known to the system."""
 
         ...
 
+    def list_other_users(self, exclude_id: str) -> List[User]:
+        """Return every user except the one with ID `exclude_id`."""
+
+        ...
+
     def add_user(self, user: User) -> None:
         """Persist a new user."""
 
         ...
 
-    def update_balance(self, user_id: str, delta: int) -> None:
+    def add_user_returning(self, user: User) -> User:
+        """
+        Persist a new user and return the stored row. If a user with the
+        same ID already exists it is left untouched and returned instead.
+        """
+
+        ...
+
+    def update_balance(self, user_id: str, delta: int) -> bool:
         """
         Adjust a user's balance by `delta`.
 
-        Implementations should atomically apply the delta.
+        Implementations should atomically apply the delta. Returns False if
+        no user with `user_id` exists.
+        """
+
+        ...
+
+    def transfer_balance(self, source_id: str, target_id: str, amount: int) -> bool:
+        """
+        Move `amount` from `source_id`'s balance to `target_id`'s.
+
+        Both sides are applied atomically: if either user is missing,
+        nothing changes and False is returned.
         """
 
         ...
@@ -32,7 +32,7 @@ class PostgresIdentityRepository(IdentityRepository):
         IDs to exactly 10 characters before storing them in the `users` table.
         """
 
-        return str(user_id).ljust(10)[:10]
+        return f"{user_id!s:<10.10}"
 
     def _ensure_table(self) -> None:
         """
@@ -77,7 +77,7 @@ class PostgresIdentityRepository(IdentityRepository):
                 if not row:
                     return None
                 # Stored as CHAR(10); strip any padding.
-                return str(row[0]).strip()
+                return row[0].strip()
 
     def _insert_mapping(
         self,
@@ -119,15 +119,14 @@ class PostgresIdentityRepository(IdentityRepository):
             last_name=last_name,
             balance=0,
         )
-        self._user_repo.add_user(user)
+        # The INSERT ... RETURNING gives us the canonical stored row, so no
+        # re-read is needed afterwards.
+        stored_user = self._user_repo.add_user_returning(user)
 
         # Insert identity mapping using the normalized user ID used in `users`.
         self._insert_mapping(provider, provider_user_id, user.id)
 
-        # Return the freshly created user (re-read to ensure we have the
-        # canonical representation).
-        stored_user = self._user_repo.get_user(user.id)
-        return stored_user or user
+        return stored_user
 
     def find_user_by_external(
         self,
@@ -5,6 +5,31 @@ from typing import Optional
 
 from domain.models import User
 from domain.repositories import IdentityRepository, UserRepository
+from infrastructure.db.sqlite_connection import get_connection, transaction
+
+_SQL_GET_INTERNAL_USER_ID = """
+    SELECT user_id
+    FROM user_identities
+    WHERE provider = ? AND provider_user_id = ?
+"""
+
+_SQL_SET_EXTERNAL_IDENTITY = """
+    INSERT INTO user_identities (provider, provider_user_id, user_id)
+    VALUES (?, ?, ?)
+    ON CONFLICT (provider, provider_user_id)
+    DO UPDATE SET user_id = excluded.user_id
+"""
+
+_SQL_CLEAR_EXTERNAL_IDENTITY = """
+    DELETE FROM user_identities
+    WHERE provider = ? AND provider_user_id = ?
+"""
+
+_SQL_GET_EXTERNAL_IDS_FOR_USER = """
+    SELECT provider_user_id
+    FROM user_identities
+    WHERE provider = ? AND user_id = ?
+"""
 
 
 class SqliteIdentityRepository(IdentityRepository):
@@ -12,51 +37,28 @@ class SqliteIdentityRepository(IdentityRepository):
     SQLite-backed implementation of `IdentityRepository`.
 
     Stores mappings from (provider, provider_user_id) to internal user IDs
-    in a `user_identities` table.
+    in a `user_identities` table (created by `infrastructure.db.schema`).
     """
 
     def __init__(self, db_path: str, user_repo: UserRepository) -> None:
         self._db_path = db_path
         self._user_repo = user_repo
-        self._ensure_table()
 
     def _get_connection(self) -> sqlite3.Connection:
-        return sqlite3.connect(self._db_path)
-
-    def _ensure_table(self) -> None:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS user_identities (
-                    provider TEXT NOT NULL,
-                    provider_user_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    PRIMARY KEY (provider, provider_user_id)
-                )
-                """
-            )
-            conn.commit()
+        return get_connection(self._db_path)
 
     def _get_internal_user_id(
         self,
         provider: str,
         provider_user_id: str,
     ) -> Optional[str]:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT user_id
-                FROM user_identities
-                WHERE provider = ? AND provider_user_id = ?
-                """,
-                (provider, provider_user_id),
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            return str(row[0])
+        row = self._get_connection().execute(
+            _SQL_GET_INTERNAL_USER_ID,
+            (provider, provider_user_id),
+        ).fetchone()
+        if not row:
+            return None
+        return row[0]
 
     def set_external_identity(
         self,
@@ -68,34 +70,20 @@ class SqliteIdentityRepository(IdentityRepository):
         Upsert a mapping from external identity to internal user ID.
         """
 
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO user_identities (provider, provider_user_id, user_id)
-                VALUES (?, ?, ?)
-                ON CONFLICT (provider, provider_user_id)
-                DO UPDATE SET user_id = excluded.user_id
-                """,
-                (provider, provider_user_id, user_id),
-            )
-            conn.commit()
+        self._get_connection().execute(
+            _SQL_SET_EXTERNAL_IDENTITY,
+            (provider, provider_user_id, user_id),
+        )
 
     def clear_external_identity(
         self,
         provider: str,
         provider_user_id: str,
     ) -> None:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                DELETE FROM user_identities
-                WHERE provider = ? AND provider_user_id = ?
-                """,
-                (provider, provider_user_id),
-            )
-            conn.commit()
+        self._get_connection().execute(
+            _SQL_CLEAR_EXTERNAL_IDENTITY,
+            (provider, provider_user_id),
+        )
 
     def get_or_create_user_from_external(
         self,
@@ -117,11 +105,12 @@ class SqliteIdentityRepository(IdentityRepository):
             last_name=last_name,
             balance=0,
         )
-        self._user_repo.add_user(user)
-        self.set_external_identity(provider, provider_user_id, user.id)
-
-        stored_user = self._user_repo.get_user(user.id)
-        return stored_user or user
+        # One transaction for both inserts; the user repository shares this
+        # thread's connection when it points at the same database.
+        with transaction(self._db_path):
+            stored_user = self._user_repo.add_user_returning(user)
+            self.set_external_identity(provider, provider_user_id, user.id)
+        return stored_user
 
     def find_user_by_external(
         self,
@@ -142,16 +131,8 @@ class SqliteIdentityRepository(IdentityRepository):
         Return all external IDs for the given internal user ID and provider.
         """
 
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT provider_user_id
-                FROM user_identities
-                WHERE provider = ? AND user_id = ?
-                """,
-                (provider, user_id),
-            )
-            rows = cur.fetchall()
-            return [str(row[0]) for row in rows]
-
+        rows = self._get_connection().execute(
+            _SQL_GET_EXTERNAL_IDS_FOR_USER,
+            (provider, user_id),
+        ).fetchall()
+        return [row[0] for row in rows]
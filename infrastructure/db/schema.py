@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlite3
+
+from infrastructure.db.sqlite_connection import get_connection
+
+# Every table and index used by the SQLite repositories. Applied in one
+# transaction by `initialize`; all statements are idempotent.
+SCHEMA_SQL = """
+BEGIN;
+
+-- WITHOUT ROWID clusters rows on the primary key, so a lookup by `id`
+-- reads the whole row from the key's B-tree instead of going through a
+-- separate autoindex and then the rowid table.
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    balance INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_identities (
+    provider TEXT NOT NULL,
+    provider_user_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (provider, provider_user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_identities_user
+ON user_identities (provider, user_id);
+
+CREATE TABLE IF NOT EXISTS tables (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS table_memberships (
+    table_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (table_name, user_id),
+    FOREIGN KEY (table_name) REFERENCES tables(name)
+);
+
+COMMIT;
+"""
+
+
+def _drop_legacy_tables(conn: sqlite3.Connection) -> None:
+    # Older databases have a `tables` table without the `name` column;
+    # drop it (and its memberships) so the schema below recreates both.
+    table_exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='tables'"
+    ).fetchone() is not None
+    if not table_exists:
+        return
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tables)")]
+    if 'name' not in columns:
+        conn.execute("DROP TABLE IF EXISTS table_memberships")
+        conn.execute("DROP TABLE IF EXISTS tables")
+
+
+def initialize(db_path: str) -> None:
+    """
+    Create or upgrade the SQLite schema at `db_path`.
+
+    Must run once at startup, before any SQLite repository is used; the
+    repositories themselves assume the schema is in place.
+    """
+
+    conn = get_connection(db_path)
+    _drop_legacy_tables(conn)
+    conn.executescript(SCHEMA_SQL)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Applied once per connection. WAL lets readers proceed while a writer
+# commits, and with WAL `synchronous=NORMAL` only risks the most recent
+# commits on power loss (never corruption). `busy_timeout` makes a writer
+# wait for a concurrent writer (e.g. the other bot's thread) instead of
+# failing immediately with "database is locked".
+_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+# Stay well below SQLite's default SQLITE_MAX_VARIABLE_NUMBER (999 on
+# older builds) when expanding `IN (...)` lists.
+MAX_IN_PARAMS = 900
+
+_local = threading.local()
+
+# The database file, connection and end-of-transaction callbacks of the
+# outermost `transaction` block in the current context. Being a context
+# variable rather than thread state, it follows the logical request: a
+# pool thread that is reused for another request does not inherit it.
+current_connection: ContextVar[
+    Optional[Tuple[str, sqlite3.Connection, List[Callable[[bool], None]]]]
+] = ContextVar("current_connection", default=None)
+
+
+def _thread_connection(db_path: str) -> sqlite3.Connection:
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        connections[db_path] = conn
+    return conn
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Return the connection to use for `db_path`.
+
+    Inside a `transaction` block on the same file this is the transaction's
+    connection. Otherwise it is the calling thread's connection, opened
+    lazily and cached per thread and per database file, so every SQLite
+    repository pointing at the same file shares it. Connections run in
+    autocommit mode: each statement commits on its own unless wrapped in
+    an explicit BEGIN/COMMIT.
+    """
+
+    scoped = current_connection.get()
+    if scoped is not None and scoped[0] == db_path:
+        return scoped[1]
+    return _thread_connection(db_path)
+
+
+@contextmanager
+def transaction(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Run the enclosed statements on one connection to `db_path` as a single
+    transaction, rolling back if the block raises.
+
+    While the block runs, `get_connection(db_path)` returns that connection
+    in the current context, so every repository call made in it joins the
+    transaction. Nested use joins the outer transaction. Callbacks
+    registered with `after_transaction` run once it has ended.
+
+    The transaction starts with BEGIN IMMEDIATE, taking the write lock up
+    front (waiting up to `busy_timeout` for it). A deferred BEGIN would
+    only take it at the first write, and a read-then-write block that
+    lost the race to another writer in between would fail at once with
+    "database is locked" instead of waiting.
+
+    SQLite connections must stay on the thread that opened them: enter the
+    block on the thread doing the work (e.g. inside the function passed to
+    `asyncio.to_thread`), not around an `await`.
+    """
+
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    callbacks: List[Callable[[bool], None]] = []
+    token = current_connection.set((db_path, conn, callbacks))
+    committed = False
+    try:
+        yield conn
+        conn.execute("COMMIT")
+        committed = True
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        current_connection.reset(token)
+        for callback in callbacks:
+            callback(committed)
+
+
+def after_transaction(db_path: str, callback: Callable[[bool], None]) -> None:
+    """
+    Call `callback(committed)` once the current `transaction` on `db_path`
+    has committed or rolled back.
+
+    Outside a transaction every statement has already committed on its
+    own, so the callback runs immediately with True.
+    """
+
+    scoped = current_connection.get()
+    if scoped is not None and scoped[0] == db_path:
+        scoped[2].append(callback)
+    else:
+        callback(True)
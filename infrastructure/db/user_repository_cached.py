@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from domain.models import User
+from domain.repositories import UserRepository
+
+T = TypeVar("T")
+
+# Registers a callback to run with `committed` once the caller's current
+# transaction ends, e.g. `functools.partial(sqlite_connection.after_transaction, db_path)`.
+AfterTransaction = Callable[[Callable[[bool], None]], None]
+
+
+def _settle_now(callback: Callable[[bool], None]) -> None:
+    # Without a transaction hook a write is durable once the wrapped call
+    # has returned.
+    callback(True)
+
+
+class CachedUserRepository(UserRepository):
+    """
+    Write-through, in-process cache in front of another `UserRepository`.
+
+    Reads are served from memory once a user (or the full user set) has
+    been loaded. Writes go to the wrapped repository and reach the cache
+    only once they are durable: `after_transaction` reports whether the
+    enclosing transaction committed, and a rolled-back write leaves the
+    cache untouched. While a write is in flight its user IDs bypass the
+    cache, so the writer reads its own uncommitted rows from the wrapped
+    repository and nothing uncommitted is cached for other threads.
+
+    This is only correct while this process is the sole writer of the
+    underlying store, which holds for the bot: both the Telegram and
+    Discord interfaces share one instance.
+    """
+
+    def __init__(
+        self,
+        inner: UserRepository,
+        after_transaction: Optional[AfterTransaction] = None,
+    ) -> None:
+        self._inner = inner
+        self._after_transaction = after_transaction or _settle_now
+        self._by_id: Dict[str, User] = {}
+        # True once `_by_id` mirrors every stored user, so misses are
+        # authoritative and `get_all_users` can skip the database.
+        self._all_loaded = False
+        # User IDs with a write that has not committed or rolled back yet.
+        self._in_flight: Counter[str] = Counter()
+        # Bumped whenever a write starts or settles. A read result is only
+        # cached if the version did not move while it was being fetched.
+        self._version = 0
+        # Guards the cache state only. It is never held across a call to
+        # the wrapped repository, so it cannot deadlock with the database's
+        # own write lock.
+        self._lock = threading.Lock()
+
+    def _apply_delta(self, user_id: str, delta: int) -> None:
+        user = self._by_id.get(user_id)
+        if user is not None:
+            self._by_id[user_id] = replace(user, balance=user.balance + delta)
+
+    def _forget(self, user_id: str) -> None:
+        # The stored row is unknown here: drop it and let the next read
+        # fetch it.
+        self._by_id.pop(user_id, None)
+        self._all_loaded = False
+
+    def _write(
+        self,
+        user_ids: Sequence[str],
+        write: Callable[[], T],
+        on_commit: Callable[[T], None],
+    ) -> T:
+        with self._lock:
+            self._in_flight.update(user_ids)
+            self._version += 1
+        try:
+            result = write()
+        except BaseException:
+            # The failed statement changed nothing.
+            self._settle(user_ids, None)
+            raise
+
+        self._after_transaction(
+            lambda committed: self._settle(
+                user_ids, (lambda: on_commit(result)) if committed else None
+            )
+        )
+        return result
+
+    def _settle(self, user_ids: Sequence[str], apply: Optional[Callable[[], None]]) -> None:
+        with self._lock:
+            self._in_flight -= Counter(user_ids)
+            self._version += 1
+            if apply is not None:
+                apply()
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            if user_id not in self._in_flight:
+                user = self._by_id.get(user_id)
+                if user is not None or self._all_loaded:
+                    return user
+            version = self._version
+
+        user = self._inner.get_user(user_id)
+        with self._lock:
+            if (
+                user is not None
+                and version == self._version
+                and user_id not in self._in_flight
+            ):
+                self._by_id[user_id] = user
+        return user
+
+    def get_users(self, user_ids: List[str]) -> List[User]:
+        with self._lock:
+            by_id = self._by_id
+            in_flight = self._in_flight
+            found = {
+                uid: by_id[uid] for uid in user_ids if uid in by_id and uid not in in_flight
+            }
+            if self._all_loaded:
+                missing = [uid for uid in user_ids if uid in in_flight]
+            else:
+                missing = [uid for uid in user_ids if uid not in found]
+            version = self._version
+
+        if missing:
+            fetched = self._inner.get_users(missing)
+            with self._lock:
+                cacheable = version == self._version
+                for user in fetched:
+                    found[user.id] = user
+                    if cacheable and user.id not in self._in_flight:
+                        self._by_id[user.id] = user
+        return [found[uid] for uid in user_ids if uid in found]
+
+    def get_all_users(self) -> List[User]:
+        with self._lock:
+            all_loaded = self._all_loaded
+            if all_loaded:
+                users = [u for uid, u in self._by_id.items() if uid not in self._in_flight]
+                pending = list(self._in_flight)
+            version = self._version
+
+        if all_loaded:
+            # Users with a write in flight come from the wrapped repository.
+            if pending:
+                users.extend(self._inner.get_users(pending))
+            return users
+
+        users = self._inner.get_all_users()
+        with self._lock:
+            if version == self._version and not self._in_flight:
+                self._by_id = {u.id: u for u in users}
+                self._all_loaded = True
+        return users
+
+    def list_other_users(self, exclude_id: str) -> List[User]:
+        return [u for u in self.get_all_users() if u.id != exclude_id]
+
+    def add_user(self, user: User) -> None:
+        # The insert may have been ignored, so the stored row is unknown.
+        self._write([user.id], lambda: self._inner.add_user(user), lambda _: self._forget(user.id))
+
+    def add_user_returning(self, user: User) -> User:
+        # Another write may land between this commit and the callback, so
+        # the returned row is not cached as-is; the next read fetches it.
+        return self._write(
+            [user.id],
+            lambda: self._inner.add_user_returning(user),
+            lambda stored: self._forget(stored.id),
+        )
+
+    def update_balance(self, user_id: str, delta: int) -> bool:
+        def on_commit(updated: bool) -> None:
+            if updated:
+                self._apply_delta(user_id, delta)
+
+        return self._write(
+            [user_id],
+            lambda: self._inner.update_balance(user_id, delta),
+            on_commit,
+        )
+
+    def transfer_balance(self, source_id: str, target_id: str, amount: int) -> bool:
+        def on_commit(transferred: bool) -> None:
+            if transferred:
+                self._apply_delta(source_id, -amount)
+                self._apply_delta(target_id, amount)
+
+        return self._write(
+            [source_id, target_id],
+            lambda: self._inner.transfer_balance(source_id, target_id, amount),
+            on_commit,
+        )
@@ -24,10 +24,10 @@ class PostgresUserRepository(UserRepository):
         # `UserTable` stores IDs padded/truncated to 10 characters. The domain
         # model works with the logical ID, so we strip whitespace padding here.
         return User(
-            id=str(row["id"]).strip(),
+            id=row["id"].strip(),
             first_name=row["first_name"],
             last_name=row["last_name"],
-            balance=int(row["balance"]),
+            balance=row["balance"],
         )
 
     def get_user(self, user_id: str) -> Optional[User]:
@@ -36,10 +36,23 @@ class PostgresUserRepository(UserRepository):
             return None
         return self._to_domain(row)
 
+    def get_users(self, user_ids: List[str]) -> List[User]:
+        by_id = {}
+        for row in self._table.get_users(user_ids):
+            user = self._to_domain(row)
+            by_id[user.id] = user
+        # Look up by the same 10-character form the rows were stored under.
+        keys = [f"{user_id!s:<10.10}".strip() for user_id in user_ids]
+        return [by_id[key] for key in keys if key in by_id]
+
     def get_all_users(self) -> List[User]:
         rows = self._table.get_all_users()
         return [self._to_domain(row) for row in rows]
 
+    def list_other_users(self, exclude_id: str) -> List[User]:
+        rows = self._table.get_other_users(exclude_id)
+        return [self._to_domain(row) for row in rows]
+
     def add_user(self, user: User) -> None:
         self._table.add_user(
             id=user.id,
@@ -48,6 +61,18 @@ class PostgresUserRepository(UserRepository):
             balance=user.balance,
         )
 
-    def update_balance(self, user_id: str, delta: int) -> None:
-        self._table.update_balance(user_id, delta)
+    def add_user_returning(self, user: User) -> User:
+        row = self._table.add_user_returning(
+            id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            balance=user.balance,
+        )
+        return self._to_domain(row)
+
+    def update_balance(self, user_id: str, delta: int) -> bool:
+        return self._table.update_balance(user_id, delta) == 1
+
+    def transfer_balance(self, source_id: str, target_id: str, amount: int) -> bool:
+        return self._table.transfer_balance(source_id, target_id, amount) == 2
 
@@ -5,6 +5,45 @@ from typing import List, Optional
 
 from domain.models import User
 from domain.repositories import UserRepository
+from infrastructure.db.sqlite_connection import MAX_IN_PARAMS, get_connection
+
+_SQL_GET_USER = "SELECT id, first_name, last_name, balance FROM users WHERE id = ?"
+
+# `{placeholders}` is filled with one `?` per ID in the chunk.
+_SQL_GET_USERS = """
+    SELECT id, first_name, last_name, balance
+    FROM users
+    WHERE id IN ({placeholders})
+"""
+
+_SQL_GET_ALL_USERS = "SELECT id, first_name, last_name, balance FROM users"
+
+_SQL_LIST_OTHER_USERS = "SELECT id, first_name, last_name, balance FROM users WHERE id != ?"
+
+_SQL_ADD_USER = """
+    INSERT OR IGNORE INTO users (id, first_name, last_name, balance)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_ADD_USER_RETURNING = """
+    INSERT INTO users (id, first_name, last_name, balance)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO NOTHING
+    RETURNING id, first_name, last_name, balance
+"""
+
+_SQL_UPDATE_BALANCE = """
+    UPDATE users
+    SET balance = balance + ?
+    WHERE id = ?
+"""
+
+_SQL_TRANSFER_BALANCE = """
+    UPDATE users
+    SET balance = balance + CASE id WHEN ? THEN ? ELSE ? END
+    WHERE id IN (?, ?)
+      AND (SELECT COUNT(*) FROM users WHERE id IN (?, ?)) = 2
+"""
 
 
 class SqliteUserRepository(UserRepository):
@@ -12,78 +51,79 @@ class SqliteUserRepository(UserRepository):
     SQLite-backed implementation of `UserRepository`.
 
     This repository owns the `users` table and maps rows to the `User`
-    domain model. It is self-initialising: the table is created if needed.
+    domain model. The table itself is created by `infrastructure.db.schema`.
     """
 
     def __init__(self, db_path: str) -> None:
         self._db_path = db_path
-        self._ensure_table()
 
     def _get_connection(self) -> sqlite3.Connection:
-        return sqlite3.connect(self._db_path)
-
-    def _ensure_table(self) -> None:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    balance INTEGER NOT NULL DEFAULT 0
-                )
-                """
-            )
-            conn.commit()
+        return get_connection(self._db_path)
 
     @staticmethod
     def _to_domain(row: sqlite3.Row) -> User:
         return User(
-            id=str(row[0]),
+            id=row[0],
             first_name=row[1],
             last_name=row[2],
-            balance=int(row[3]),
+            balance=row[3],
         )
 
     def get_user(self, user_id: str) -> Optional[User]:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT id, first_name, last_name, balance FROM users WHERE id = ?", (user_id,))
-            row = cur.fetchone()
-            if not row:
-                return None
-            return self._to_domain(row)
+        row = self._get_connection().execute(_SQL_GET_USER, (user_id,)).fetchone()
+        if not row:
+            return None
+        return self._to_domain(row)
+
+    def get_users(self, user_ids: List[str]) -> List[User]:
+        by_id = {}
+        conn = self._get_connection()
+        for start in range(0, len(user_ids), MAX_IN_PARAMS):
+            chunk = user_ids[start : start + MAX_IN_PARAMS]
+            sql = _SQL_GET_USERS.format(placeholders=",".join("?" * len(chunk)))
+            for row in conn.execute(sql, chunk):
+                by_id[row[0]] = self._to_domain(row)
+        return [by_id[user_id] for user_id in user_ids if user_id in by_id]
 
     def get_all_users(self) -> List[User]:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT id, first_name, last_name, balance FROM users")
-            rows = cur.fetchall()
-            return [self._to_domain(row) for row in rows]
+        rows = self._get_connection().execute(_SQL_GET_ALL_USERS).fetchall()
+        return [self._to_domain(row) for row in rows]
+
+    def list_other_users(self, exclude_id: str) -> List[User]:
+        rows = self._get_connection().execute(_SQL_LIST_OTHER_USERS, (exclude_id,)).fetchall()
+        return [self._to_domain(row) for row in rows]
 
     def add_user(self, user: User) -> None:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT OR IGNORE INTO users (id, first_name, last_name, balance)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user.id, user.first_name, user.last_name, user.balance),
-            )
-            conn.commit()
-
-    def update_balance(self, user_id: str, delta: int) -> None:
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                UPDATE users
-                SET balance = balance + ?
-                WHERE id = ?
-                """,
-                (delta, user_id),
-            )
-            conn.commit()
+        self._get_connection().execute(
+            _SQL_ADD_USER,
+            (user.id, user.first_name, user.last_name, user.balance),
+        )
 
+    def add_user_returning(self, user: User) -> User:
+        conn = self._get_connection()
+        # Drain the cursor so the INSERT statement runs to completion.
+        rows = conn.execute(
+            _SQL_ADD_USER_RETURNING,
+            (user.id, user.first_name, user.last_name, user.balance),
+        ).fetchall()
+        if not rows:
+            # Conflict: the user already exists, return it as stored.
+            rows = conn.execute(_SQL_GET_USER, (user.id,)).fetchall()
+        return self._to_domain(rows[0])
+
+    def update_balance(self, user_id: str, delta: int) -> bool:
+        cur = self._get_connection().execute(_SQL_UPDATE_BALANCE, (delta, user_id))
+        return cur.rowcount == 1
+
+    def transfer_balance(self, source_id: str, target_id: str, amount: int) -> bool:
+        # A single statement is atomic on its own, so the debit and credit
+        # either both land or (when a user is missing) neither does.
+        cur = self._get_connection().execute(
+            _SQL_TRANSFER_BALANCE,
+            (
+                source_id, -amount, amount,
+                source_id, target_id,
+                source_id, target_id,
+            ),
+        )
+        return cur.rowcount == 2
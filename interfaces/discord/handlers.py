@@ -1,21 +1,48 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Sequence, Tuple, TypeVar, Union
 
 import discord
 from discord.ext import commands
 
 from application.services import (
+    BroadcastMessage,
+    BulkBroadcast,
     ExternalContext,
     buy_chips_from_bank,
     buy_chips_from_user,
+    external_context,
     logout_external_identity,
     register_or_login_user,
     sell_chips_to_bank,
     sell_chips_to_user,
 )
 from domain.repositories import AccountRepository, IdentityRepository, UserRepository
+from infrastructure.db.sqlite_connection import transaction
 from infrastructure.db.table_repository_sqlite import SqliteTableRepository
+from interfaces.dispatch.coalescing_queue import CoalescingQueue
+from interfaces.dispatch.rate_limiter import AsyncRateLimiter
+
+# Repository and service calls block on SQLite, so handlers run them via
+# `asyncio.to_thread` on a small dedicated pool instead of on the event loop.
+# Each command makes one such call: a transaction for commands that write
+# (see `_run_in_transaction`), plain autocommit reads for the rest.
+_DB_WORKERS = 4
+
+# Discord allows about 5 messages per 5 seconds in a channel.
+_CHANNEL_SEND_RATE = 5
+_CHANNEL_SEND_PERIOD = 5.0
+
+T = TypeVar("T")
+
+
+def _run_in_transaction(db_path: str, func: Callable[..., T], *args: object) -> T:
+    # Runs on the worker thread, so the transaction's connection never
+    # crosses threads or spans an `await`.
+    with transaction(db_path):
+        return func(*args)
 
 
 def _build_external_context(user: discord.abc.User) -> ExternalContext:
@@ -24,12 +51,7 @@ def _build_external_context(user: discord.abc.User) -> ExternalContext:
     # Discord has `name` and `display_name`; here we just store the full
     # display name in `first_name` to keep things simple.
     display_name = user.display_name or user.name
-    return ExternalContext(
-        provider="discord",
-        provider_user_id=str(user.id),
-        first_name=display_name,
-        last_name="",
-    )
+    return external_context("discord", str(user.id), display_name, "")
 
 
 def create_discord_bot(
@@ -37,17 +59,26 @@ def create_discord_bot(
     identity_repo: IdentityRepository,
     account_repo: AccountRepository,
     table_repo: SqliteTableRepository,
+    db_path: str,
 ) -> commands.Bot:
     """
     Configure and return a Discord bot with behaviour analogous to
     the Telegram interface: /start, /help, buy/sell chips, and list players.
+
+    Each command's database work runs in one call on the worker pool.
+    Commands that write run it as one transaction on `db_path`; read-only
+    commands skip the transaction, since BEGIN IMMEDIATE would make them
+    queue behind every writer for SQLite's write lock.
     """
 
-    intents = discord.Intents.default()
-    intents.message_content = True
+    # Only what prefix commands need: guild/channel state, message events
+    # and their content. Every other intent (members, presences,
+    # reactions, typing, ...) stays off so the gateway does not stream
+    # events the bot would only parse and drop.
+    intents = discord.Intents.none()
     intents.guilds = True
-    intents.members = True
-    intents.reactions = True
+    intents.messages = True
+    intents.message_content = True
 
     # Disable the default help command so we can provide our own `!help`.
     bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
@@ -56,6 +87,51 @@ def create_discord_bot(
     # confirmation message ID.
     pending_requests: Dict[int, Tuple[str, str, int, int]] = {}
     # value: (buyer_internal_id, seller_internal_id, amount, seller_discord_id)
+
+    # Outgoing announcements are paced per channel to stay inside Discord's
+    # per-channel message limit, rather than tripping it and having
+    # discord.py sleep out the retry-after while holding the bucket.
+    channel_limiters: Dict[int, AsyncRateLimiter] = {}
+
+    async def send_limited(channel: discord.abc.Messageable, text: str) -> None:
+        key = getattr(channel, "id", id(channel))
+        limiter = channel_limiters.get(key)
+        if limiter is None:
+            limiter = channel_limiters[key] = AsyncRateLimiter(
+                _CHANNEL_SEND_RATE, _CHANNEL_SEND_PERIOD
+            )
+        async with limiter:
+            await channel.send(text)
+
+    # Transaction announcements are coalesced per channel; priority ones
+    # (the caller's own bank buy/sell) flush the channel's pending lines
+    # and go out without waiting for the coalescing window.
+    announcer: CoalescingQueue[discord.abc.Messageable] = CoalescingQueue(send_limited)
+
+    async def run_db(func: Callable[..., T], *args: object) -> T:
+        return await asyncio.to_thread(_run_in_transaction, db_path, func, *args)
+
+    async def read_db(func: Callable[..., T], *args: object) -> T:
+        # Under WAL, reads outside a transaction never wait for a writer.
+        return await asyncio.to_thread(func, *args)
+
+    async def announce(
+        channel: discord.abc.Messageable,
+        broadcasts: Sequence[Union[BroadcastMessage, BulkBroadcast]],
+    ) -> None:
+        # Enqueue concurrently so several priority sends overlap instead of
+        # waiting on one HTTP round trip each.
+        enqueue = announcer.enqueue
+        await asyncio.gather(
+            *(enqueue(channel, b.text, priority=b.priority) for b in broadcasts)
+        )
+
+    @bot.event
+    async def setup_hook():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=_DB_WORKERS, thread_name_prefix="discord-db")
+        )
+
     @bot.event
     async def on_ready():
         print(f"Discord bot logged in as {bot.user} (id={bot.user.id})")
@@ -82,7 +158,7 @@ def create_discord_bot(
 
     @bot.command(name="new")
     async def new_table_cmd(ctx: commands.Context, table_name: str):
-        created = table_repo.create_table(table_name)
+        created = await run_db(table_repo.create_table, table_name)
         if not created:
             await ctx.send(f"Table '{table_name}' already exists.")
         else:
@@ -91,23 +167,26 @@ def create_discord_bot(
     @bot.command(name="join")
     async def join_cmd(ctx: commands.Context, table_name: str, username: str):
         external_ctx = _build_external_context(ctx.author)
-        result = register_or_login_user(
-            external_ctx,
-            username,
-            account_repo,
-            identity_repo,
-            user_repo,
-        )
+
+        def join_table():
+            result = register_or_login_user(
+                external_ctx,
+                username,
+                account_repo,
+                identity_repo,
+                user_repo,
+            )
+            if result.success:
+                # Link this user to the specific table.
+                user = identity_repo.find_user_by_external("discord", str(ctx.author.id))
+                if user is not None:
+                    table_repo.add_user_to_table(table_name, user.id)
+            return result
+
+        result = await run_db(join_table)
         if not result.success:
             await ctx.send(result.error_message or "Join failed.")
         else:
-            # Link this user to the specific table.
-            user = identity_repo.find_user_by_external(
-                "discord", str(ctx.author.id)
-            )
-            if user is not None:
-                table_repo.add_user_to_table(table_name, user.id)
-
             await ctx.send(
                 f"You have joined table '{table_name}' as '{username}'. You can now buy/sell chips."
             )
@@ -115,18 +194,25 @@ def create_discord_bot(
     @bot.command(name="leave")
     async def leave_cmd(ctx: commands.Context):
         external_ctx = _build_external_context(ctx.author)
-        logout_external_identity(external_ctx, identity_repo)
+        await run_db(logout_external_identity, external_ctx, identity_repo)
         await ctx.send("You have been logged out on this account.")
 
     @bot.command(name="me")
     async def me_cmd(ctx: commands.Context):
         external_ctx = _build_external_context(ctx.author)
 
-        # Resolve the logged-in user for this external identity.
-        user = identity_repo.find_user_by_external(
-            external_ctx.provider,
-            external_ctx.provider_user_id,
-        )
+        def load_profile():
+            # Resolve the logged-in user for this external identity.
+            user = identity_repo.find_user_by_external(
+                external_ctx.provider,
+                external_ctx.provider_user_id,
+            )
+            if user is None:
+                return None, []
+            # Find all tables the user is a member of.
+            return user, table_repo.list_tables_for_user(user.id)
+
+        user, tables = await read_db(load_profile)
         if user is None:
             await ctx.send(
                 "You are not logged in. Use !join <table> <username> first."
@@ -136,8 +222,6 @@ def create_discord_bot(
         # Username is stored in `first_name` on the User model.
         username = user.first_name
 
-        # Find all tables the user is a member of.
-        tables = table_repo.list_tables_for_user(user.id)
         tables_text = ", ".join(tables) if tables else "None"
 
         reply = (
@@ -151,7 +235,7 @@ def create_discord_bot(
     async def list_cmd(ctx: commands.Context, table_name: str | None = None):
         # If no table name provided, list all tables
         if table_name is None:
-            tables = table_repo.list_all_tables()
+            tables = await read_db(table_repo.list_all_tables)
             if not tables:
                 await ctx.send("No tables available.")
             else:
@@ -160,28 +244,30 @@ def create_discord_bot(
                 await ctx.send("\n".join(lines))
             return
 
-        if not table_repo.exists(table_name):
-            await ctx.send(f"Table '{table_name}' does not exist.")
-            return
+        def load_players():
+            # None if the table does not exist.
+            if not table_repo.exists(table_name):
+                return None
+            user_ids = table_repo.get_user_ids_for_table(table_name)
+            return user_repo.get_users(user_ids) if user_ids else []
 
-        user_ids = table_repo.get_user_ids_for_table(table_name)
-        if not user_ids:
-            await ctx.send(f"No players at table '{table_name}'.")
+        users = await read_db(load_players)
+        if users is None:
+            await ctx.send(f"Table '{table_name}' does not exist.")
             return
 
-        users = []
-        for uid in user_ids:
-            u = user_repo.get_user(uid)
-            if u is not None:
-                users.append(u)
-
         if not users:
             await ctx.send(f"No players at table '{table_name}'.")
             return
 
-        lines = [f"{u.first_name}: {u.balance}" for u in users]
-        total = sum(u.balance for u in users)
-        lines.append(f"Total balance: {total}")
+        # One pass builds the lines and the total together.
+        lines = []
+        append = lines.append
+        total = 0
+        for u in users:
+            append(f"{u.first_name}: {u.balance}")
+            total += u.balance
+        append(f"Total balance: {total}")
         await ctx.send("\n".join(lines))
 
     @bot.command(name="buy")
@@ -199,14 +285,16 @@ def create_discord_bot(
 
         if username is None:
             # Bank buy.
-            result = buy_chips_from_bank(
+            result = await run_db(
+                buy_chips_from_bank,
                 external_ctx,
                 amount,
                 identity_repo,
                 user_repo,
             )
         else:
-            result = buy_chips_from_user(
+            result = await run_db(
+                buy_chips_from_user,
                 external_ctx,
                 amount,
                 username,
@@ -219,12 +307,11 @@ def create_discord_bot(
             await ctx.send(result.error_message or "Buy failed.")
             return
 
-        text = (
-            result.broadcasts[0].text
-            if result.broadcasts
-            else "Buy completed."
-        )
-        await ctx.send(text)
+        if not result.broadcasts:
+            await ctx.send("Buy completed.")
+            return
+
+        await announce(ctx.channel, result.broadcasts)
 
     @bot.command(name="sell")
     async def sell_cmd(
@@ -240,14 +327,16 @@ def create_discord_bot(
         external_ctx = _build_external_context(ctx.author)
 
         if username is None:
-            result = sell_chips_to_bank(
+            result = await run_db(
+                sell_chips_to_bank,
                 external_ctx,
                 amount,
                 identity_repo,
                 user_repo,
             )
         else:
-            result = sell_chips_to_user(
+            result = await run_db(
+                sell_chips_to_user,
                 external_ctx,
                 amount,
                 username,
@@ -260,12 +349,11 @@ def create_discord_bot(
             await ctx.send(result.error_message or "Sell failed.")
             return
 
-        text = (
-            result.broadcasts[0].text
-            if result.broadcasts
-            else "Sell completed."
-        )
-        await ctx.send(text)
+        if not result.broadcasts:
+            await ctx.send("Sell completed.")
+            return
+
+        await announce(ctx.channel, result.broadcasts)
 
     return bot
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+
+class CoalescingQueue(Generic[K]):
+    """
+    Per-destination outbound queue that merges bursts into single messages.
+
+    Messages enqueued for the same destination within `window` seconds are
+    joined with newlines and delivered as one send, so a burst of table
+    activity costs one API call instead of one per event and stays clear
+    of per-chat rate limits. At most `max_batch` lines go into a single
+    message; reaching that many flushes immediately.
+
+    Priority messages skip the window and are sent straight away, after
+    flushing whatever is already pending for that destination so messages
+    still arrive in the order they were enqueued.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[K, str], Awaitable[object]],
+        *,
+        window: float = 0.2,
+        max_batch: int = 25,
+    ) -> None:
+        self._send = send
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: Dict[K, List[str]] = {}
+        self._flushers: Dict[K, asyncio.Task] = {}
+
+    async def enqueue(self, key: K, text: str, *, priority: bool = False) -> None:
+        if priority:
+            batch = self._pending.pop(key, None)
+            if batch:
+                await self._send(key, "\n".join(batch))
+            await self._send(key, text)
+            return
+
+        pending = self._pending.setdefault(key, [])
+        pending.append(text)
+        if len(pending) >= self._max_batch:
+            del self._pending[key]
+            await self._send(key, "\n".join(pending))
+            return
+
+        if key not in self._flushers:
+            self._flushers[key] = asyncio.create_task(self._flush_loop(key))
+
+    async def _flush_loop(self, key: K) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self._window)
+                batch = self._pending.pop(key, None)
+                if not batch:
+                    # Nothing arrived during the last window: stop, and let
+                    # the next enqueue start a fresh flusher.
+                    return
+                await self._send(key, "\n".join(batch))
+        except Exception:
+            logger.exception("Failed to flush coalesced messages for %r", key)
+        finally:
+            self._flushers.pop(key, None)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Leaky-bucket limiter for coroutines: at most `max_rate` acquisitions
+    per `period` seconds, with bursts of up to `max_rate`.
+
+    Use as `async with limiter:` around the rate-limited call. Waiters are
+    served in arrival order; a caller over the limit sleeps just long
+    enough for capacity to drain instead of sending and being told to
+    retry later.
+    """
+
+    def __init__(self, max_rate: float, period: float = 1.0) -> None:
+        self._max_rate = max_rate
+        self._drain_per_second = max_rate / period
+        self._level = 0.0
+        self._last_check = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _drain(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_check
+        self._level = max(self._level - elapsed * self._drain_per_second, 0.0)
+        self._last_check = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._drain()
+                if self._level + 1 <= self._max_rate:
+                    self._level += 1
+                    return
+                await asyncio.sleep((self._level + 1 - self._max_rate) / self._drain_per_second)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
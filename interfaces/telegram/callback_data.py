@@ -1,25 +1,85 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import re
+import struct
+from typing import Optional, Tuple
+
+_CONFIRMATION_TAGS = frozenset(("yes", "no"))
+
+# Compact form for the common case of two internal user IDs (32-char hex
+# UUIDs): kind byte, both IDs as raw 16 bytes, unsigned 32-bit amount,
+# base64url-encoded without padding. That is 50 characters, whereas the
+# text form of the same callback exceeds Telegram's 64-byte callback_data
+# limit. It never contains ':', which is how parsers tell the forms apart.
+_COMPACT = struct.Struct("<B16s16sI")
+_COMPACT_LEN = (_COMPACT.size * 4 + 2) // 3
+_HEX_ID_RE = re.compile(r"[0-9a-f]{32}")
+_MAX_COMPACT_AMOUNT = 2**32 - 1
+
+_KIND_CHOICE = 0
+_KIND_YES = 1
+_KIND_NO = 2
+
+
+def _encode_compact(kind: int, source_id: str, target_id: str, amount: int) -> Optional[str]:
+    if not (
+        _HEX_ID_RE.fullmatch(source_id)
+        and _HEX_ID_RE.fullmatch(target_id)
+        and 0 <= amount <= _MAX_COMPACT_AMOUNT
+    ):
+        return None
+
+    packed = _COMPACT.pack(kind, bytes.fromhex(source_id), bytes.fromhex(target_id), amount)
+    return base64.urlsafe_b64encode(packed).rstrip(b"=").decode("ascii")
+
+
+def _decode_compact(data: str) -> Optional[Tuple[int, str, str, int]]:
+    if len(data) != _COMPACT_LEN:
+        return None
+    try:
+        packed = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    except (binascii.Error, ValueError):
+        return None
+    if len(packed) != _COMPACT.size:
+        return None
+
+    kind, source, target, amount = _COMPACT.unpack(packed)
+    return kind, source.hex(), target.hex(), amount
+
 
 def encode_buy_from_choice(source_user_id: str, target_user_id: str, amount: int) -> str:
     """
     Encode a "choose seller" callback.
 
-    Format: from:{source_id}:to:{target_id}:{amount}
+    Format: compact binary form when both IDs are hex UUIDs, otherwise
+    from:{source_id}:to:{target_id}:{amount}
     """
 
+    compact = _encode_compact(_KIND_CHOICE, source_user_id, target_user_id, amount)
+    if compact is not None:
+        return compact
     return f"from:{source_user_id}:to:{target_user_id}:{amount}"
 
 
 def parse_buy_from_choice(data: str) -> tuple[str, str, int]:
-    parts = data.split(":")
-    if len(parts) != 5 or parts[0] != "from" or parts[2] != "to":
+    if ":" not in data:
+        decoded = _decode_compact(data)
+        if decoded is None or decoded[0] != _KIND_CHOICE:
+            raise ValueError(f"Invalid buy-from choice callback data: {data}")
+        _, source_id, target_id, amount = decoded
+        return source_id, target_id, amount
+
+    # Unpacking checks the arity; one tuple compare checks both tags.
+    try:
+        tag, source_id, to_tag, target_id, amount = data.split(":")
+    except ValueError:
+        raise ValueError(f"Invalid buy-from choice callback data: {data}") from None
+    if (tag, to_tag) != ("from", "to") or not source_id or not target_id:
         raise ValueError(f"Invalid buy-from choice callback data: {data}")
 
-    source_id = parts[1]
-    target_id = parts[3]
-    amount = int(parts[4])
-    return source_id, target_id, amount
+    return source_id, target_id, int(amount)
 
 
 def encode_buy_from_confirmation(
@@ -31,23 +91,33 @@ def encode_buy_from_confirmation(
     """
     Encode a confirmation/decline callback.
 
-    Format:
+    Format: compact binary form when both IDs are hex UUIDs, otherwise
       yes:{source_id}:{target_id}:{amount}
       no:{source_id}:{target_id}:{amount}
     """
 
+    kind = _KIND_YES if accepted else _KIND_NO
+    compact = _encode_compact(kind, source_user_id, target_user_id, amount)
+    if compact is not None:
+        return compact
+
     prefix = "yes" if accepted else "no"
     return f"{prefix}:{source_user_id}:{target_user_id}:{amount}"
 
 
 def parse_buy_from_confirmation(data: str) -> tuple[bool, str, str, int]:
-    parts = data.split(":")
-    if len(parts) != 4 or parts[0] not in ("yes", "no"):
-        raise ValueError(f"Invalid buy-from confirmation callback data: {data}")
+    if ":" not in data:
+        decoded = _decode_compact(data)
+        if decoded is None or decoded[0] not in (_KIND_YES, _KIND_NO):
+            raise ValueError(f"Invalid buy-from confirmation callback data: {data}")
+        kind, source_id, target_id, amount = decoded
+        return kind == _KIND_YES, source_id, target_id, amount
 
-    accepted = parts[0] == "yes"
-    source_id = parts[1]
-    target_id = parts[2]
-    amount = int(parts[3])
-    return accepted, source_id, target_id, amount
+    try:
+        tag, source_id, target_id, amount = data.split(":")
+    except ValueError:
+        raise ValueError(f"Invalid buy-from confirmation callback data: {data}") from None
+    if tag not in _CONFIRMATION_TAGS or not source_id or not target_id:
+        raise ValueError(f"Invalid buy-from confirmation callback data: {data}")
 
+    return tag == "yes", source_id, target_id, int(amount)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-import telebot
+import asyncio
+import logging
+from functools import partial
+from typing import NamedTuple
+
+from telebot.async_telebot import AsyncTeleBot
 
 from application.services import (
     ExternalContext,
     buy_chips_from_bank,
     buy_chips_from_user,
+    external_context,
     logout_external_identity,
     register_or_login_user,
     sell_chips_to_bank,
@@ -14,258 +20,317 @@ from application.services import (
 from domain.repositories import AccountRepository, IdentityRepository, UserRepository
 from infrastructure.db.table_repository_sqlite import SqliteTableRepository
 
+logger = logging.getLogger(__name__)
+
 
 def _build_external_context(message) -> ExternalContext:
     """Extract a channel-agnostic context object from a Telegram message."""
 
-    return ExternalContext(
-        provider="telegram",
-        provider_user_id=str(message.from_user.id),
-        first_name=message.from_user.first_name or "",
-        last_name=message.from_user.last_name or "",
+    from_user = message.from_user
+    return external_context(
+        "telegram",
+        str(from_user.id),
+        from_user.first_name or "",
+        from_user.last_name or "",
     )
 
 
-def create_telegram_bot(
-    bot_token: str,
-    user_repo: UserRepository,
-    identity_repo: IdentityRepository,
-    account_repo: AccountRepository,
-    table_repo: SqliteTableRepository,
-) -> telebot.TeleBot:
-    """
-    Configure and return a TeleBot instance wired to the application layer.
+class RepoBundle(NamedTuple):
+    """The repositories a Telegram handler may need, passed as one argument."""
 
-    This module contains only Telegram-specific concerns: parsing Telegram
-    messages/callbacks and mapping them to/from application services.
-    """
+    user_repo: UserRepository
+    identity_repo: IdentityRepository
+    account_repo: AccountRepository
+    table_repo: SqliteTableRepository
+
+
+async def handle_start(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    await bot.send_message(
+        message.chat.id,
+        "Welcome to the poker table bot!\n"
+        "Use /buy and /sell to manage chips.\n"
+        "Type /help to see available commands.",
+    )
+
+
+async def handle_help(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    await bot.send_message(
+        message.chat.id,
+        "/new <table>           - create a new table\n"
+        "/buy <amount> [user]   - buy chips (bank if no user, or from username)\n"
+        "/sell <amount> [user]  - sell chips (bank if no user, or to username)\n"
+        "/list [table]          - list all tables (or players at a specific table)\n"
+        "/me                    - show your username, tables, and balance\n"
+        "/join <table> <username> - register/login and join table\n"
+        "/leave                 - logout from this account\n",
+    )
 
-    bot = telebot.TeleBot(bot_token)
 
-    @bot.message_handler(commands=["start", "hello"])
-    def handle_start(message):
-        bot.send_message(
+async def handle_new_table(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    table_repo = repos.table_repo
+
+    parts = message.text.split()
+    if len(parts) < 2:
+        await bot.send_message(message.chat.id, "Usage: /new <table>")
+        return
+
+    _, table_name = parts[0], parts[1]
+    created = await asyncio.to_thread(table_repo.create_table, table_name)
+    if not created:
+        await bot.send_message(message.chat.id, f"Table '{table_name}' already exists.")
+    else:
+        await bot.send_message(message.chat.id, f"Table '{table_name}' has been created.")
+
+
+async def handle_join(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    user_repo, identity_repo, account_repo, table_repo = repos
+
+    parts = message.text.split()
+    if len(parts) < 3:
+        await bot.send_message(
             message.chat.id,
-            "Welcome to the poker table bot!\n"
-            "Use /buy and /sell to manage chips.\n"
-            "Type /help to see available commands.",
+            "Usage: /join <table> <username>",
         )
+        return
 
-    @bot.message_handler(commands=["help"])
-    def handle_help(message):
-        bot.send_message(
+    _, table_name, username = parts[0], parts[1], parts[2]
+
+    if not await asyncio.to_thread(table_repo.exists, table_name):
+        await bot.send_message(
             message.chat.id,
-            "/new <table>           - create a new table\n"
-            "/buy <amount> [user]   - buy chips (bank if no user, or from username)\n"
-            "/sell <amount> [user]  - sell chips (bank if no user, or to username)\n"
-            "/list [table]          - list all tables (or players at a specific table)\n"
-            "/me                    - show your username, tables, and balance\n"
-            "/join <table> <username> - register/login and join table\n"
-            "/leave                 - logout from this account\n",
+            f"Table '{table_name}' does not exist. Use /new {table_name} first.",
         )
+        return
 
-    @bot.message_handler(commands=["new"])
-    def handle_new_table(message):
-        parts = message.text.split()
-        if len(parts) < 2:
-            bot.send_message(message.chat.id, "Usage: /new <table>")
-            return
-
-        _, table_name = parts[0], parts[1]
-        created = table_repo.create_table(table_name)
-        if not created:
-            bot.send_message(message.chat.id, f"Table '{table_name}' already exists.")
-        else:
-            bot.send_message(message.chat.id, f"Table '{table_name}' has been created.")
-
-    @bot.message_handler(commands=["join"])
-    def handle_join(message):
-        parts = message.text.split()
-        if len(parts) < 3:
-            bot.send_message(
-                message.chat.id,
-                "Usage: /join <table> <username>",
-            )
-            return
+    external_ctx = _build_external_context(message)
 
-        _, table_name, username = parts[0], parts[1], parts[2]
+    result = await asyncio.to_thread(
+        register_or_login_user,
+        external_ctx,
+        username,
+        account_repo,
+        identity_repo,
+        user_repo,
+    )
+    if not result.success:
+        await bot.send_message(message.chat.id, result.error_message)
+    else:
+        # Link this user to the specific table.
+        user = await asyncio.to_thread(
+            identity_repo.find_user_by_external,
+            external_ctx.provider,
+            external_ctx.provider_user_id,
+        )
+        if user is not None:
+            await asyncio.to_thread(table_repo.add_user_to_table, table_name, user.id)
 
-        if not table_repo.exists(table_name):
-            bot.send_message(
-                message.chat.id,
-                f"Table '{table_name}' does not exist. Use /new {table_name} first.",
-            )
-            return
+        await bot.send_message(
+            message.chat.id,
+            f"You have joined table '{table_name}' as '{username}'. You can now buy/sell chips.",
+        )
+
+
+async def handle_leave(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    identity_repo = repos.identity_repo
 
-        external_ctx = _build_external_context(message)
+    external_ctx = _build_external_context(message)
+    await asyncio.to_thread(logout_external_identity, external_ctx, identity_repo)
+    await bot.send_message(message.chat.id, "You have been logged out on this account.")
 
-        result = register_or_login_user(
-            external_ctx,
-            username,
-            account_repo,
-            identity_repo,
-            user_repo,
+
+async def handle_me(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    identity_repo = repos.identity_repo
+    table_repo = repos.table_repo
+
+    external_ctx = _build_external_context(message)
+
+    # Resolve the logged-in user for this external identity.
+    user = await asyncio.to_thread(
+        identity_repo.find_user_by_external,
+        external_ctx.provider,
+        external_ctx.provider_user_id,
+    )
+    if user is None:
+        await bot.send_message(
+            message.chat.id,
+            "You are not logged in. Use /join <table> <username> first.",
         )
-        if not result.success:
-            bot.send_message(message.chat.id, result.error_message)
+        return
+
+    # Username is stored in `first_name` on the User model.
+    username = user.first_name
+
+    # Find all tables the user is a member of.
+    tables = await asyncio.to_thread(table_repo.list_tables_for_user, user.id)
+    tables_text = ", ".join(tables) if tables else "None"
+
+    reply = (
+        f"Username: {username}\n"
+        f"Tables: {tables_text}\n"
+        f"Balance: {user.balance}"
+    )
+    await bot.send_message(message.chat.id, reply)
+
+
+async def handle_list(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    user_repo = repos.user_repo
+    table_repo = repos.table_repo
+
+    parts = message.text.split()
+    
+    # If no table name provided, list all tables
+    if len(parts) < 2:
+        tables = await asyncio.to_thread(table_repo.list_all_tables)
+        if not tables:
+            await bot.send_message(message.chat.id, "No tables available.")
         else:
-            # Link this user to the specific table.
-            user = identity_repo.find_user_by_external(
-                external_ctx.provider, external_ctx.provider_user_id
+            lines = ["Available tables:"]
+            lines.extend(tables)
+            await bot.send_message(message.chat.id, "\n".join(lines))
+        return
+
+    _, table_name = parts[0], parts[1]
+
+    if not await asyncio.to_thread(table_repo.exists, table_name):
+        await bot.send_message(message.chat.id, f"Table '{table_name}' does not exist.")
+        return
+
+    user_ids = await asyncio.to_thread(table_repo.get_user_ids_for_table, table_name)
+    if not user_ids:
+        await bot.send_message(message.chat.id, f"No players at table '{table_name}'.")
+        return
+
+    users = await asyncio.to_thread(user_repo.get_users, user_ids)
+
+    if not users:
+        await bot.send_message(message.chat.id, f"No players at table '{table_name}'.")
+        return
+
+    # One pass builds the lines and the total together.
+    lines = []
+    append = lines.append
+    total = 0
+    for u in users:
+        append(f"{u.first_name}: {u.balance}")
+        total += u.balance
+    append(f"Total balance: {total}")
+
+    await bot.send_message(message.chat.id, "\n".join(lines))
+
+
+async def handle_transaction(bot: AsyncTeleBot, repos: RepoBundle, message) -> None:
+    user_repo = repos.user_repo
+    identity_repo = repos.identity_repo
+    account_repo = repos.account_repo
+
+    # Only the first three words are used; anything after them stays
+    # unsplit in a fourth part.
+    parts = message.text.split(None, 3)
+    if len(parts) < 2:
+        await bot.send_message(message.chat.id, "Please enter amount of chips.")
+        return
+
+    op = parts[0][1:]  # strip leading '/'
+
+    try:
+        amount = int(parts[1])
+    except ValueError:
+        await bot.send_message(message.chat.id, "Amount must be a number.")
+        return
+
+    username = parts[2] if len(parts) > 2 else None
+
+    external_ctx = _build_external_context(message)
+
+    if op == "buy":
+        if username:
+            # Player-to-player buy using a platform username.
+            result = await asyncio.to_thread(
+                buy_chips_from_user,
+                external_ctx,
+                amount,
+                username,
+                account_repo,
+                identity_repo,
+                user_repo,
             )
-            if user is not None:
-                table_repo.add_user_to_table(table_name, user.id)
-
-            bot.send_message(
-                message.chat.id,
-                f"You have joined table '{table_name}' as '{username}'. You can now buy/sell chips.",
+        else:
+            # Bank buy.
+            result = await asyncio.to_thread(
+                buy_chips_from_bank, external_ctx, amount, identity_repo, user_repo
             )
+    elif op == "sell":
+        if username:
+            result = await asyncio.to_thread(
+                sell_chips_to_user,
+                external_ctx,
+                amount,
+                username,
+                account_repo,
+                identity_repo,
+                user_repo,
+            )
+        else:
+            # Bank sell.
+            result = await asyncio.to_thread(
+                sell_chips_to_bank, external_ctx, amount, identity_repo, user_repo
+            )
+    else:
+        await bot.send_message(message.chat.id, "Unknown operation.")
+        return
+
+    if not result.success:
+        await bot.send_message(message.chat.id, result.error_message)
+        return
+
+    text = (
+        result.broadcasts[0].text
+        if result.broadcasts
+        else "Operation completed."
+    )
+    try:
+        await bot.send_message(message.chat.id, text)
+    except Exception:
+        logger.exception("Failed to send %s reply to chat %s", op, message.chat.id)
+
+
+# (commands, handler) pairs registered by `create_telegram_bot`.
+_HANDLERS = (
+    (("start", "hello"), handle_start),
+    (("help",), handle_help),
+    (("new",), handle_new_table),
+    (("join",), handle_join),
+    (("leave",), handle_leave),
+    (("me",), handle_me),
+    (("list",), handle_list),
+    (("buy", "sell"), handle_transaction),
+)
 
-    @bot.message_handler(commands=["leave"])
-    def handle_leave(message):
-        external_ctx = _build_external_context(message)
-        logout_external_identity(external_ctx, identity_repo)
-        bot.send_message(message.chat.id, "You have been logged out on this account.")
 
-    @bot.message_handler(commands=["me"])
-    def handle_me(message):
-        external_ctx = _build_external_context(message)
+def create_telegram_bot(
+    bot_token: str,
+    user_repo: UserRepository,
+    identity_repo: IdentityRepository,
+    account_repo: AccountRepository,
+    table_repo: SqliteTableRepository,
+) -> AsyncTeleBot:
+    """
+    Configure and return an AsyncTeleBot instance wired to the application layer.
 
-        # Resolve the logged-in user for this external identity.
-        user = identity_repo.find_user_by_external(
-            external_ctx.provider,
-            external_ctx.provider_user_id,
-        )
-        if user is None:
-            bot.send_message(
-                message.chat.id,
-                "You are not logged in. Use /join <table> <username> first.",
-            )
-            return
+    This module contains only Telegram-specific concerns: parsing Telegram
+    messages/callbacks and mapping them to/from application services.
 
-        # Username is stored in `first_name` on the User model.
-        username = user.first_name
+    Handlers are module-level coroutines bound to this bot and its
+    repositories with `functools.partial`. They run on the event loop, so
+    repository and service calls (which block on the database) go through
+    `asyncio.to_thread`.
+    """
 
-        # Find all tables the user is a member of.
-        tables = table_repo.list_tables_for_user(user.id)
-        tables_text = ", ".join(tables) if tables else "None"
+    bot = AsyncTeleBot(bot_token)
 
-        reply = (
-            f"Username: {username}\n"
-            f"Tables: {tables_text}\n"
-            f"Balance: {user.balance}"
-        )
-        bot.send_message(message.chat.id, reply)
-
-    @bot.message_handler(commands=["list"])
-    def handle_list(message):
-        parts = message.text.split()
-        
-        # If no table name provided, list all tables
-        if len(parts) < 2:
-            tables = table_repo.list_all_tables()
-            if not tables:
-                bot.send_message(message.chat.id, "No tables available.")
-            else:
-                lines = ["Available tables:"]
-                lines.extend(tables)
-                bot.send_message(message.chat.id, "\n".join(lines))
-            return
-
-        _, table_name = parts[0], parts[1]
-
-        if not table_repo.exists(table_name):
-            bot.send_message(message.chat.id, f"Table '{table_name}' does not exist.")
-            return
-
-        user_ids = table_repo.get_user_ids_for_table(table_name)
-        if not user_ids:
-            bot.send_message(message.chat.id, f"No players at table '{table_name}'.")
-            return
-
-        users = []
-        for uid in user_ids:
-            u = user_repo.get_user(uid)
-            if u is not None:
-                users.append(u)
-
-        if not users:
-            bot.send_message(message.chat.id, f"No players at table '{table_name}'.")
-            return
-
-        lines = [f"{u.first_name}: {u.balance}" for u in users]
-        total = sum(u.balance for u in users)
-        lines.append(f"Total balance: {total}")
-
-        bot.send_message(message.chat.id, "\n".join(lines))
-
-    @bot.message_handler(commands=["buy", "sell"])
-    def handle_transaction(message):
-        parts = message.text.split()
-        if len(parts) < 2:
-            bot.send_message(message.chat.id, "Please enter amount of chips.")
-            return
-
-        op = parts[0][1:]  # strip leading '/'
-
-        try:
-            amount = int(parts[1])
-        except ValueError:
-            bot.send_message(message.chat.id, "Amount must be a number.")
-            return
-
-        username = parts[2] if len(parts) > 2 else None
-
-        external_ctx = _build_external_context(message)
-
-        try:
-            if op == "buy":
-                if username:
-                    # Player-to-player buy using a platform username.
-                    result = buy_chips_from_user(
-                        external_ctx,
-                        amount,
-                        username,
-                        account_repo,
-                        identity_repo,
-                        user_repo,
-                    )
-                else:
-                    # Bank buy.
-                    result = buy_chips_from_bank(
-                        external_ctx, amount, identity_repo, user_repo
-                    )
-            elif op == "sell":
-                if username:
-                    result = sell_chips_to_user(
-                        external_ctx,
-                        amount,
-                        username,
-                        account_repo,
-                        identity_repo,
-                        user_repo,
-                    )
-                else:
-                    # Bank sell.
-                    result = sell_chips_to_bank(
-                        external_ctx, amount, identity_repo, user_repo
-                    )
-            else:
-                bot.send_message(message.chat.id, "Unknown operation.")
-                return
-
-            if not result.success:
-                bot.send_message(message.chat.id, result.error_message)
-                return
-
-            text = (
-                result.broadcasts[0].text
-                if result.broadcasts
-                else "Operation completed."
-            )
-            bot.send_message(message.chat.id, text)
-        except Exception as exc:  # Keep a broad catch to mirror original behavior.
-            bot.send_message(message.chat.id, str(exc))
+    repos = RepoBundle(user_repo, identity_repo, account_repo, table_repo)
+    for commands, handler in _HANDLERS:
+        bot.message_handler(commands=list(commands))(partial(handler, bot, repos))
 
     return bot
 
@@ -1,11 +1,17 @@
+import asyncio
 import os
 import threading
+from functools import partial
 
 from dotenv import load_dotenv
 
+from domain.repositories import UserRepository
+from infrastructure.db import schema
 from infrastructure.db.account_repository_sqlite import SqliteAccountRepository
 from infrastructure.db.identity_repository_sqlite import SqliteIdentityRepository
+from infrastructure.db.sqlite_connection import after_transaction
 from infrastructure.db.table_repository_sqlite import SqliteTableRepository
+from infrastructure.db.user_repository_cached import CachedUserRepository
 from infrastructure.db.user_repository_sqlite import SqliteUserRepository
 from interfaces.discord.handlers import create_discord_bot
 from interfaces.telegram.handlers import create_telegram_bot
@@ -19,7 +25,7 @@ DB_PATH = os.environ.get("DB_PATH", "poker.db")
 
 
 def _run_telegram_bot(
-    user_repo: SqliteUserRepository,
+    user_repo: UserRepository,
     identity_repo: SqliteIdentityRepository,
     account_repo: SqliteAccountRepository,
     table_repo: SqliteTableRepository,
@@ -28,11 +34,12 @@ def _run_telegram_bot(
         raise RuntimeError("BOT_TOKEN environment variable is not set.")
 
     bot = create_telegram_bot(BOT_TOKEN, user_repo, identity_repo, account_repo, table_repo)
-    bot.infinity_polling()
+    # The Telegram bot is async; it gets its own event loop in this thread.
+    asyncio.run(bot.infinity_polling())
 
 
 def _run_discord_bot(
-    user_repo: SqliteUserRepository,
+    user_repo: UserRepository,
     identity_repo: SqliteIdentityRepository,
     account_repo: SqliteAccountRepository,
 ) -> None:
@@ -42,12 +49,20 @@ def _run_discord_bot(
 
     table_repo = SqliteTableRepository(DB_PATH)
 
-    bot = create_discord_bot(user_repo, identity_repo, account_repo, table_repo)
+    bot = create_discord_bot(user_repo, identity_repo, account_repo, table_repo, DB_PATH)
     bot.run(DISCORD_TOKEN)
 
 
 def main() -> None:
-    user_repo = SqliteUserRepository(DB_PATH)
+    schema.initialize(DB_PATH)
+
+    # One cached instance is shared by both bots so their writes keep the
+    # cache coherent. Writes reach the cache only once their transaction
+    # has committed.
+    user_repo = CachedUserRepository(
+        SqliteUserRepository(DB_PATH),
+        after_transaction=partial(after_transaction, DB_PATH),
+    )
     identity_repo = SqliteIdentityRepository(DB_PATH, user_repo)
     account_repo = SqliteAccountRepository(DB_PATH)
     table_repo = SqliteTableRepository(DB_PATH)
@@ -1,4 +1,5 @@
 import unittest
+from dataclasses import replace
 
 from application.services import (
     ExternalContext,
@@ -18,15 +19,31 @@ class InMemoryUserRepository(UserRepository):
     def get_user(self, user_id: str):
         return self.users.get(user_id)
 
+    def get_users(self, user_ids):
+        return [self.users[uid] for uid in user_ids if uid in self.users]
+
     def get_all_users(self):
         return list(self.users.values())
 
+    def list_other_users(self, exclude_id: str):
+        return [u for u in self.users.values() if u.id != exclude_id]
+
     def add_user(self, user: User) -> None:
         self.users[user.id] = user
 
-    def update_balance(self, user_id: str, delta: int) -> None:
-        user = self.users[user_id]
-        user.balance += delta
+    def update_balance(self, user_id: str, delta: int) -> bool:
+        user = self.users.get(user_id)
+        if user is None:
+            return False
+        self.users[user_id] = replace(user, balance=user.balance + delta)
+        return True
+
+    def transfer_balance(self, source_id: str, target_id: str, amount: int) -> bool:
+        if source_id not in self.users or target_id not in self.users:
+            return False
+        self.update_balance(source_id, -amount)
+        self.update_balance(target_id, amount)
+        return True
 
 
 class InMemoryIdentityRepository(IdentityRepository):
@@ -128,6 +145,49 @@ class ApplicationServicesTests(unittest.TestCase):
         self.assertEqual(buyer.balance, -50)
         self.assertEqual(seller.balance, 150)
 
+    def test_confirm_buy_from_player_emits_single_broadcast_to_all(self):
+        for user_id, name in (("1", "Ann"), ("2", "Bob"), ("3", "Cid")):
+            self.user_repo.add_user(
+                User(id=user_id, first_name=name, last_name="", balance=0)
+            )
+
+        result = confirm_buy_from_player("1", "2", 30, self.user_repo)
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.broadcasts), 1)
+        broadcast = result.broadcasts[0]
+        self.assertEqual(broadcast.audience, "all")
+        self.assertIsNone(broadcast.user_id)
+        self.assertEqual(broadcast.text, "Ann buys 30 from Bob")
+
+    def test_confirm_buy_from_player_rejects_self_transfer(self):
+        self.user_repo.add_user(User(id="1", first_name="Ann", last_name="", balance=0))
+
+        result = confirm_buy_from_player("1", "1", 30, self.user_repo)
+        self.assertFalse(result.success)
+        self.assertEqual(result.error_message, "You cannot buy chips from yourself.")
+        self.assertEqual(self.user_repo.get_user("1").balance, 0)
+
+    def test_confirm_buy_from_player_fails_when_user_missing(self):
+        self.user_repo.add_user(User(id="1", first_name="Ann", last_name="", balance=0))
+
+        result = confirm_buy_from_player("1", "2", 30, self.user_repo)
+        self.assertFalse(result.success)
+        self.assertEqual(self.user_repo.get_user("1").balance, 0)
+
+    def test_confirm_buy_from_player_fails_when_transfer_finds_no_user(self):
+        for user_id, name in (("1", "Ann"), ("2", "Bob")):
+            self.user_repo.add_user(
+                User(id=user_id, first_name=name, last_name="", balance=0)
+            )
+        # The seller disappears between the lookup and the transfer.
+        self.user_repo.transfer_balance = lambda *args: False
+
+        result = confirm_buy_from_player("1", "2", 30, self.user_repo)
+        self.assertFalse(result.success)
+        self.assertEqual(result.broadcasts, [])
+        self.assertEqual(self.user_repo.get_user("1").balance, 0)
+        self.assertEqual(self.user_repo.get_user("2").balance, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import uuid
+
+from interfaces.telegram.callback_data import (
+    encode_buy_from_choice,
+    encode_buy_from_confirmation,
+    parse_buy_from_choice,
+    parse_buy_from_confirmation,
+)
+
+SOURCE = uuid.UUID(int=1).hex
+TARGET = uuid.UUID(int=2**128 - 1).hex
+
+
+class CompactCallbackDataTests(unittest.TestCase):
+    def test_choice_round_trips(self):
+        data = encode_buy_from_choice(SOURCE, TARGET, 250)
+        self.assertNotIn(":", data)
+        self.assertLessEqual(len(data.encode()), 64)
+        self.assertEqual(parse_buy_from_choice(data), (SOURCE, TARGET, 250))
+
+    def test_confirmation_round_trips(self):
+        for accepted in (True, False):
+            data = encode_buy_from_confirmation(SOURCE, TARGET, 2**32 - 1, accepted)
+            self.assertNotIn(":", data)
+            self.assertEqual(
+                parse_buy_from_confirmation(data), (accepted, SOURCE, TARGET, 2**32 - 1)
+            )
+
+    def test_kinds_are_not_interchangeable(self):
+        choice = encode_buy_from_choice(SOURCE, TARGET, 1)
+        confirmation = encode_buy_from_confirmation(SOURCE, TARGET, 1, True)
+        with self.assertRaises(ValueError):
+            parse_buy_from_confirmation(choice)
+        with self.assertRaises(ValueError):
+            parse_buy_from_choice(confirmation)
+
+    def test_rejects_non_base64_of_compact_length(self):
+        for parse in (parse_buy_from_choice, parse_buy_from_confirmation):
+            with self.assertRaises(ValueError):
+                parse("!" * 50)
+
+    def test_rejects_unknown_kind_byte(self):
+        # Kind 2 ("no") only differs from kind 7 in the first byte.
+        data = encode_buy_from_confirmation(SOURCE, TARGET, 1, False)
+        forged = "Bw" + data[2:]
+        with self.assertRaises(ValueError):
+            parse_buy_from_confirmation(forged)
+        with self.assertRaises(ValueError):
+            parse_buy_from_choice(forged)
+
+
+class TextCallbackDataTests(unittest.TestCase):
+    def test_non_hex_ids_use_text_form(self):
+        data = encode_buy_from_choice("alice", "bob", 10)
+        self.assertEqual(data, "from:alice:to:bob:10")
+        self.assertEqual(parse_buy_from_choice(data), ("alice", "bob", 10))
+
+    def test_uppercase_hex_ids_use_text_form(self):
+        target = TARGET.upper()
+        data = encode_buy_from_confirmation(SOURCE, target, 10, True)
+        self.assertEqual(data, f"yes:{SOURCE}:{target}:10")
+        self.assertEqual(parse_buy_from_confirmation(data), (True, SOURCE, target, 10))
+
+    def test_amount_beyond_32_bits_uses_text_form(self):
+        data = encode_buy_from_confirmation(SOURCE, TARGET, 2**32, False)
+        self.assertEqual(data, f"no:{SOURCE}:{TARGET}:{2**32}")
+        self.assertEqual(parse_buy_from_confirmation(data), (False, SOURCE, TARGET, 2**32))
+
+    def test_choice_rejects_malformed_text(self):
+        for data in (
+            "from:a:to:b",
+            "from:a:to:b:1:extra",
+            "form:a:to:b:1",
+            "from:a:at:b:1",
+            "from::to:b:1",
+            "from:a:to::1",
+            "from:a:to:b:many",
+        ):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_buy_from_choice(data)
+
+    def test_confirmation_rejects_malformed_text(self):
+        for data in (
+            "yes:a:b",
+            "yes:a:b:1:extra",
+            "maybe:a:b:1",
+            "yes::b:1",
+            "no:a::1",
+            "no:a:b:many",
+        ):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_buy_from_confirmation(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from interfaces.dispatch.coalescing_queue import CoalescingQueue
+
+
+class CoalescingQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.sent = []
+
+        async def send(key, text):
+            self.sent.append((key, text))
+
+        self.send = send
+
+    async def test_burst_within_window_is_sent_once(self):
+        queue = CoalescingQueue(self.send, window=0.05)
+        for text in ("one", "two", "three"):
+            await queue.enqueue("chan", text)
+        await queue.enqueue("other", "four")
+        self.assertEqual(self.sent, [])
+
+        await asyncio.sleep(0.15)
+        self.assertCountEqual(self.sent, [("chan", "one\ntwo\nthree"), ("other", "four")])
+
+    async def test_later_window_gets_its_own_send(self):
+        queue = CoalescingQueue(self.send, window=0.05)
+        await queue.enqueue("chan", "one")
+        await asyncio.sleep(0.15)
+        await queue.enqueue("chan", "two")
+        await asyncio.sleep(0.15)
+
+        self.assertEqual(self.sent, [("chan", "one"), ("chan", "two")])
+
+    async def test_max_batch_flushes_immediately(self):
+        queue = CoalescingQueue(self.send, window=10.0, max_batch=3)
+        for text in ("one", "two", "three"):
+            await queue.enqueue("chan", text)
+
+        self.assertEqual(self.sent, [("chan", "one\ntwo\nthree")])
+
+    async def test_priority_skips_the_window(self):
+        queue = CoalescingQueue(self.send, window=10.0)
+        await queue.enqueue("chan", "queued")
+        await queue.enqueue("chan", "urgent", priority=True)
+
+        # Pending lines for the same key go out first, keeping the order.
+        self.assertEqual(self.sent, [("chan", "queued"), ("chan", "urgent")])
+
+    async def test_priority_leaves_other_keys_pending(self):
+        queue = CoalescingQueue(self.send, window=10.0)
+        await queue.enqueue("other", "queued")
+        await queue.enqueue("chan", "urgent", priority=True)
+
+        self.assertEqual(self.sent, [("chan", "urgent")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import time
+import unittest
+
+from interfaces.dispatch.rate_limiter import AsyncRateLimiter
+
+
+class AsyncRateLimiterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_waits_for_capacity_once_burst_is_used(self):
+        limiter = AsyncRateLimiter(5, 0.5)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        burst = time.monotonic() - start
+
+        await limiter.acquire()
+        waited = time.monotonic() - start
+
+        # The burst is immediate; the next slot drains after period / max_rate.
+        self.assertLess(burst, 0.05)
+        self.assertGreaterEqual(waited, 0.09)
+        self.assertLess(waited, 0.3)
+
+    async def test_waiters_are_served_in_arrival_order(self):
+        limiter = AsyncRateLimiter(2, 0.2)
+        order = []
+
+        async def worker(n):
+            async with limiter:
+                order.append(n)
+
+        tasks = []
+        for n in range(6):
+            tasks.append(asyncio.create_task(worker(n)))
+            # Let each task reach the limiter before the next one starts.
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(order, list(range(6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
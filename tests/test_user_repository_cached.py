@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+
+from domain.models import User
+from infrastructure.db import schema
+from infrastructure.db.sqlite_connection import after_transaction, transaction
+from infrastructure.db.user_repository_cached import CachedUserRepository
+from infrastructure.db.user_repository_sqlite import SqliteUserRepository
+
+
+class CountingUserRepository:
+    """Forwards to a real repository and counts the read calls."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.reads = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if name.startswith("get_"):
+            def counted(*args):
+                self.reads += 1
+                return attr(*args)
+
+            return counted
+        return attr
+
+
+class CachedUserRepositoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "test.db")
+        schema.initialize(self.db_path)
+
+        self.store = SqliteUserRepository(self.db_path)
+        self.store.add_user(User(id="a", first_name="Ann", last_name="", balance=0))
+        self.store.add_user(User(id="b", first_name="Bob", last_name="", balance=0))
+
+        self.inner = CountingUserRepository(self.store)
+        self.repo = CachedUserRepository(
+            self.inner, after_transaction=partial(after_transaction, self.db_path)
+        )
+
+    def test_get_user_hits_cache_after_first_read(self):
+        self.assertEqual(self.repo.get_user("a").first_name, "Ann")
+        self.assertEqual(self.repo.get_user("a").first_name, "Ann")
+        self.assertEqual(self.inner.reads, 1)
+
+    def test_get_user_miss_is_not_cached_before_full_load(self):
+        self.assertIsNone(self.repo.get_user("zzz"))
+        self.assertIsNone(self.repo.get_user("zzz"))
+        self.assertEqual(self.inner.reads, 2)
+
+    def test_get_user_miss_is_authoritative_after_full_load(self):
+        self.assertEqual(len(self.repo.get_all_users()), 2)
+        self.assertIsNone(self.repo.get_user("zzz"))
+        self.assertEqual([u.id for u in self.repo.get_users(["b", "zzz", "a"])], ["b", "a"])
+        self.assertEqual(len(self.repo.get_all_users()), 2)
+        self.assertEqual(self.inner.reads, 1)
+
+    def test_add_user_invalidates_full_load(self):
+        self.repo.get_all_users()
+        self.repo.add_user(User(id="c", first_name="Cid", last_name="", balance=5))
+
+        self.assertEqual(self.repo.get_user("c").balance, 5)
+        self.assertEqual(len(self.repo.get_all_users()), 3)
+
+    def test_update_and_transfer_patch_cached_balances(self):
+        self.repo.get_all_users()
+        reads = self.inner.reads
+
+        self.assertTrue(self.repo.update_balance("a", 100))
+        self.assertTrue(self.repo.transfer_balance("a", "b", 30))
+
+        self.assertEqual(self.repo.get_user("a").balance, 70)
+        self.assertEqual(self.repo.get_user("b").balance, 30)
+        self.assertEqual(self.inner.reads, reads)
+
+    def test_failed_transfer_leaves_cache_unchanged(self):
+        self.repo.get_all_users()
+        self.assertFalse(self.repo.transfer_balance("a", "zzz", 30))
+        self.assertEqual(self.repo.get_user("a").balance, 0)
+
+    def test_rollback_leaves_cache_at_committed_values(self):
+        self.repo.get_all_users()
+
+        with self.assertRaises(RuntimeError):
+            with transaction(self.db_path):
+                self.repo.transfer_balance("a", "b", 30)
+                # The writer sees its own uncommitted change.
+                self.assertEqual(self.repo.get_user("a").balance, -30)
+                raise RuntimeError("abort")
+
+        self.assertEqual(self.repo.get_user("a").balance, 0)
+        self.assertEqual(self.repo.get_user("b").balance, 0)
+        self.assertEqual(self.store.get_user("a").balance, 0)
+
+    def test_commit_applies_patch_once_transaction_ends(self):
+        self.repo.get_all_users()
+
+        with transaction(self.db_path):
+            self.repo.update_balance("a", 10)
+            self.repo.update_balance("a", 5)
+
+        self.assertEqual(self.repo.get_user("a").balance, 15)
+        self.assertEqual(self.store.get_user("a").balance, 15)
+
+    def test_uncommitted_write_is_not_visible_to_other_threads(self):
+        self.repo.get_all_users()
+        seen = []
+
+        with transaction(self.db_path):
+            self.repo.update_balance("a", 10)
+            reader = threading.Thread(target=lambda: seen.append(self.repo.get_user("a").balance))
+            reader.start()
+            reader.join()
+
+        self.assertEqual(seen, [0])
+        self.assertEqual(self.repo.get_user("a").balance, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
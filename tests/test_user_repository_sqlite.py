@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from domain.models import User
+from infrastructure.db import schema
+from infrastructure.db.user_repository_sqlite import SqliteUserRepository
+
+
+class SqliteUserRepositoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = os.path.join(tmp.name, "test.db")
+        schema.initialize(db_path)
+
+        self.repo = SqliteUserRepository(db_path)
+        self.repo.add_user(User(id="a", first_name="Ann", last_name="", balance=100))
+        self.repo.add_user(User(id="b", first_name="Bob", last_name="", balance=0))
+
+    def test_transfer_balance_moves_amount(self):
+        self.assertTrue(self.repo.transfer_balance("a", "b", 30))
+        self.assertEqual(self.repo.get_user("a").balance, 70)
+        self.assertEqual(self.repo.get_user("b").balance, 30)
+
+    def test_transfer_balance_with_missing_target_changes_nothing(self):
+        self.assertFalse(self.repo.transfer_balance("a", "zzz", 30))
+        self.assertEqual(self.repo.get_user("a").balance, 100)
+
+    def test_transfer_balance_with_missing_source_changes_nothing(self):
+        self.assertFalse(self.repo.transfer_balance("zzz", "b", 30))
+        self.assertEqual(self.repo.get_user("b").balance, 0)
+
+    def test_transfer_balance_to_self_changes_nothing(self):
+        self.assertFalse(self.repo.transfer_balance("a", "a", 30))
+        self.assertEqual(self.repo.get_user("a").balance, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
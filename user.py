@@ -10,7 +10,7 @@ class UserTable:
 
     def add_user(self, id, first_name, last_name, balance=0):
         # Ensure id is exactly 10 characters
-        id = str(id).ljust(10)[:10]  # Pad with spaces or truncate to 10 characters
+        id = f'{id!s:<10.10}'  # Pad with spaces or truncate to 10 characters
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -20,9 +20,33 @@ class UserTable:
             ''', (id, first_name, last_name, balance))
             conn.commit()
 
+    def add_user_returning(self, id, first_name, last_name, balance=0):
+        # Ensure id is exactly 10 characters
+        id = f'{id!s:<10.10}'
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO users (id, first_name, last_name, balance)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id, first_name, last_name, balance
+            ''', (id, first_name, last_name, balance))
+            row = cursor.fetchone()
+            if row is None:
+                # Already present: return the existing row instead.
+                cursor.execute('SELECT * FROM users WHERE id = %s', (id,))
+                row = cursor.fetchone()
+            conn.commit()
+            return {
+                'id': row[0],
+                'first_name': row[1],
+                'last_name': row[2],
+                'balance': row[3]
+            }
+
     def update_balance(self, id, amount):
         # Ensure id is exactly 10 characters
-        id = str(id).ljust(10)[:10]
+        id = f'{id!s:<10.10}'
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -31,10 +55,30 @@ class UserTable:
             WHERE id = %s
             ''', (amount, id))
             conn.commit()
+            return cursor.rowcount
+
+    def transfer_balance(self, source_id, target_id, amount):
+        # Ensure ids are exactly 10 characters
+        source_id = f'{source_id!s:<10.10}'
+        target_id = f'{target_id!s:<10.10}'
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # One statement: both rows change or (if either id is missing)
+            # none do.
+            cursor.execute('''
+            UPDATE users
+            SET balance = balance + CASE id WHEN %s THEN %s ELSE %s END
+            WHERE id IN (%s, %s)
+              AND (SELECT COUNT(*) FROM users WHERE id IN (%s, %s)) = 2
+            ''', (source_id, -amount, amount,
+                  source_id, target_id,
+                  source_id, target_id))
+            conn.commit()
+            return cursor.rowcount
 
     def get_user(self, id):
         # Ensure id is exactly 10 characters
-        id = str(id).ljust(10)[:10]
+        id = f'{id!s:<10.10}'
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE id = %s', (id,))
@@ -48,6 +92,20 @@ class UserTable:
                 }
             return None
 
+    def get_users(self, ids):
+        # Ensure every id is exactly 10 characters
+        ids = [f'{id!s:<10.10}' for id in ids]
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE id = ANY(%s)', (ids,))
+            rows = cursor.fetchall()
+            return [{
+                'id': row[0],
+                'first_name': row[1],
+                'last_name': row[2],
+                'balance': row[3]
+            } for row in rows]
+
     def get_all_users(self):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -60,9 +118,23 @@ class UserTable:
                 'balance': row[3]
             } for row in rows]
 
+    def get_other_users(self, id):
+        # Ensure id is exactly 10 characters
+        id = f'{id!s:<10.10}'
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE id != %s', (id,))
+            rows = cursor.fetchall()
+            return [{
+                'id': row[0],
+                'first_name': row[1],
+                'last_name': row[2],
+                'balance': row[3]
+            } for row in rows]
+
     def delete_user(self, id):
         # Ensure id is exactly 10 characters
-        id = str(id).ljust(10)[:10]
+        id = f'{id!s:<10.10}'
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM users WHERE id = %s', (id,))